@@ -1,42 +1,224 @@
-import json
+import logging
 import os
-import sys
+import threading
+import time
+from queue import Queue
 import numpy as np
+import pandas as pd
+import torch
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from .test_diarization import perform_diarization
+from .test_asr import (
+    perform_speech_recognition,
+    DIARIZATION_COLUMNS,
+    extract_audio_segments,
+    iter_transcribed_segments,
+    build_asr_metrics
+)
+from .test_correction import test_correction, correct_texts_batch, build_correction_metrics
+from .test_summarization import test_summarization, create_meeting_minutes
+from utils.cache import (
+    get_stage_cache_key,
+    hash_file,
+    has_stage_cache,
+    load_stage_cache,
+    save_stage_cache
+)
+from utils.config import ModelConfig, Stage, get_torch_dtype
+from utils.serialization import write_csv, write_json, write_parquet
+from utils.models import load_asr_model, load_correction_model
 
-from test_diarization import perform_diarization
-from test_asr import perform_speech_recognition
-from test_correction import test_correction
-from test_summarization import test_summarization, create_meeting_minutes
+log = logging.getLogger(__name__)
 
-def convert_metrics_for_json(metrics):
-    """Convert metrics with numpy/pandas types to JSON-serializable types.
+STAGE_LABELS = {
+    Stage.DIARIZATION: "Diarization",
+    Stage.ASR: "Speech recognition",
+    Stage.CORRECTION: "Correction",
+    Stage.SUMMARIZATION: "Summarization"
+}
+
+def has_failures(metrics):
+    """Check whether any item of a stage failed or fell back to a placeholder.
     
     Args:
-        metrics: Dictionary with metrics
+        metrics: Stage metrics dictionary
         
     Returns:
-        dict: JSON-serializable dictionary
+        bool: True if the stage output is incomplete
     """
-    def convert_value(value):
-        if isinstance(value, (np.integer, np.int64)):
-            return int(value)
-        elif isinstance(value, (np.floating, np.float64)):
-            return float(value)
-        elif isinstance(value, np.ndarray):
-            return value.tolist()
-        else:
-            return value
-    
-    if isinstance(metrics, dict):
-        return {key: convert_metrics_for_json(value) for key, value in metrics.items()}
-    else:
-        return convert_value(metrics)
+    return metrics.get("failed_segments", 0) > 0 or metrics.get("failed_speakers", 0) > 0
+
+
+def run_cached_stage(stage_name, cache_key, output_path, write_output, stage_function, cache_output=True):
+    """Run pipeline stage or reuse its cached output.
+    
+    Output is cached only if the stage completed without failures.
+    
+    Args:
+        stage_name: Pipeline stage name
+        cache_key: Key identifying stage inputs and configuration
+        output_path: Path for stage output file read by the next stage
+        write_output: Writer used to restore the stage output file on a cache hit
+        stage_function: Callable running the stage and returning (DataFrame, metrics)
+        cache_output: Whether the output may be cached (False if an earlier stage failed)
+        
+    Returns:
+        tuple: (DataFrame with stage results, dictionary with metrics)
+    """
+    load_start_time = time.time()
+    cached_result = load_stage_cache(stage_name, cache_key)
+    if cached_result is not None:
+        dataframe, metrics = cached_result
+        write_output(dataframe, output_path)
+        metrics["cached"] = True
+        metrics["cached_execution_time"] = metrics["execution_time"]
+        metrics["execution_time"] = time.time() - load_start_time
+        log.info("Using cached %s results", stage_name)
+        return dataframe, metrics
+    
+    dataframe, metrics = stage_function()
+    if cache_output and not dataframe.empty and not has_failures(metrics):
+        save_stage_cache(stage_name, cache_key, dataframe, metrics)
+    return dataframe, metrics
+
+
+def run_overlapped_asr_correction(
+    audio_file_path,
+    diarization_path,
+    asr_output_path,
+    correction_output_path
+):
+    """Run speech recognition and correction with overlapping execution.
+    
+    ASR runs in a worker thread and pushes recognized segments into a bounded
+    queue, while the main thread corrects them in batches as they arrive.
+    Each stage's execution_time includes loading its model, as in the sequential
+    stage functions, so stage times add up to wall-clock time.
+    
+    Args:
+        audio_file_path: Path to input audio file
+        diarization_path: Path to Parquet file with diarization results
+        asr_output_path: Path for output Parquet file with transcriptions
+        correction_output_path: Path for output Parquet file with corrected texts
+        
+    Returns:
+        tuple: (ASR DataFrame, ASR metrics, correction DataFrame, correction metrics)
+    """
+    asr_load_start_time = time.time()
+    asr_pipeline = load_asr_model()
+    asr_load_time = time.time() - asr_load_start_time
+    
+    correction_load_start_time = time.time()
+    correction_model, correction_tokenizer = load_correction_model()
+    correction_load_time = time.time() - correction_load_start_time
+    
+    start_time = time.time()
+    diarization_dataframe = pd.read_parquet(diarization_path, columns=DIARIZATION_COLUMNS)
+    audio_segments = extract_audio_segments(audio_file_path, diarization_dataframe)
+    
+    segment_queue = Queue(maxsize=ModelConfig.PIPELINE_QUEUE_SIZE)
+    transcription_results = []
+    failed_segments = 0
+    worker_errors = []
+    asr_end_time = start_time
+    
+    def asr_worker():
+        nonlocal failed_segments, asr_end_time
+        try:
+            stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+            with torch.cuda.stream(stream):
+                for batch_results, batch_failed_segments in iter_transcribed_segments(audio_segments, asr_pipeline):
+                    transcription_results.extend(batch_results)
+                    failed_segments += batch_failed_segments
+                    segment_queue.put(batch_results)
+        except BaseException as error:
+            worker_errors.append(error)
+        finally:
+            asr_end_time = time.time()
+            segment_queue.put(None)
+    
+    log.info("Transcribing and correcting %d segments...", len(audio_segments))
+    asr_thread = threading.Thread(target=asr_worker, daemon=True)
+    asr_thread.start()
+    
+    corrected_texts = []
+    successful_corrections = 0
+    processing_times = []
+    pending_texts = []
+    
+    def correct_pending():
+        nonlocal successful_corrections
+        batch_start_time = time.time()
+        batch_results = correct_texts_batch(pending_texts, correction_model, correction_tokenizer)
+        batch_processing_time = time.time() - batch_start_time
+        processing_times.extend([batch_processing_time / len(pending_texts)] * len(pending_texts))
+        
+        for corrected_text, success_status in batch_results:
+            corrected_texts.append(corrected_text)
+            if success_status:
+                successful_corrections += 1
+        pending_texts.clear()
+    
+    while True:
+        batch_results = segment_queue.get()
+        if batch_results is None:
+            break
+        
+        for segment_result in batch_results:
+            pending_texts.append(segment_result["text"])
+            if len(pending_texts) >= ModelConfig.CORRECTION_BATCH_SIZE:
+                correct_pending()
+    
+    if pending_texts:
+        correct_pending()
+    asr_thread.join()
+    
+    if worker_errors:
+        raise worker_errors[0]
+    
+    asr_execution_time = asr_load_time + asr_end_time - start_time
+    correction_execution_time = correction_load_time + max(time.time() - asr_end_time, 0.0)
+    
+    asr_dataframe = pd.DataFrame(transcription_results)
+    if asr_dataframe.empty:
+        log.warning("No speech recognized in any segments")
+        return (
+            asr_dataframe,
+            {"execution_time": asr_execution_time, "segments_processed": len(audio_segments)},
+            pd.DataFrame(),
+            {}
+        )
+    
+    correction_dataframe = asr_dataframe.copy()
+    correction_dataframe["corrected_text"] = corrected_texts
+    asr_dataframe = asr_dataframe.sort_values("start_time").reset_index(drop=True)
+    correction_dataframe = correction_dataframe.sort_values("start_time").reset_index(drop=True)
+    
+    write_parquet(asr_dataframe, asr_output_path)
+    asr_metrics = build_asr_metrics(asr_dataframe, len(audio_segments), failed_segments, asr_execution_time)
+    
+    write_parquet(correction_dataframe, correction_output_path)
+    correction_metrics = build_correction_metrics(
+        correction_dataframe,
+        successful_corrections,
+        processing_times,
+        correction_execution_time
+    )
+    correction_metrics["overlapped_with_asr"] = True
+    
+    log.info("Speech recognition completed in %.2f seconds", asr_execution_time)
+    log.info("Correction model load and remaining correction took %.2f seconds", correction_execution_time)
+    log.info("Correction success rate: %.2f%%", correction_metrics["success_rate"] * 100)
+    
+    return asr_dataframe, asr_metrics, correction_dataframe, correction_metrics
+
 
 def run_complete_pipeline(audio_file_path, output_prefix="test"):
     """Run complete pipeline with metrics collection.
     
+    Stage outputs are cached on disk by audio content and model configuration,
+    so models are only loaded for stages that have to be recomputed.
+    
     Args:
         audio_file_path: Path to input audio file
         output_prefix: Prefix for output files
@@ -52,74 +234,154 @@ def run_complete_pipeline(audio_file_path, output_prefix="test"):
     
     # 1. Diarization
     print("\n1. DIARIZATION STAGE")
-    diarization_output_path = f"{output_prefix}_diarization.csv"
-    diarization_dataframe, diarization_metrics = perform_diarization(
-        audio_file_path, 
-        diarization_output_path
+    diarization_output_path = f"{output_prefix}_diarization.parquet"
+    diarization_cache_key = get_stage_cache_key({
+        "audio": hash_file(audio_file_path),
+        "model": ModelConfig.DIARIZATION_MODEL_NAME,
+        "min_segment_duration": ModelConfig.MIN_SEGMENT_DURATION
+    })
+    diarization_dataframe, diarization_metrics = run_cached_stage(
+        "diarization",
+        diarization_cache_key,
+        diarization_output_path,
+        write_parquet,
+        lambda: perform_diarization(
+            audio_file_path, 
+            diarization_output_path
+        )
     )
     all_metrics["diarization"] = diarization_metrics
+    upstream_complete = not has_failures(diarization_metrics)
     
     if diarization_dataframe.empty:
         print("Diarization failed - stopping pipeline")
         return all_metrics
     
-    # 2. Speech Recognition
-    print("\n2. SPEECH RECOGNITION STAGE")
-    asr_output_path = f"{output_prefix}_asr.csv"
-    asr_dataframe, asr_metrics = perform_speech_recognition(
-        audio_file_path,
-        diarization_output_path,
-        asr_output_path
-    )
-    all_metrics["asr"] = asr_metrics
-    
-    if asr_dataframe.empty:
-        print("Speech recognition failed - stopping pipeline")
-        return all_metrics
+    asr_output_path = f"{output_prefix}_asr.parquet"
+    asr_cache_key = get_stage_cache_key({
+        "diarization": diarization_cache_key,
+        "backend": ModelConfig.ASR_BACKEND,
+        "model": ModelConfig.ASR_MODEL_NAME,
+        "faster_whisper_model": ModelConfig.ASR_FASTER_WHISPER_MODEL_NAME,
+        "language": ModelConfig.ASR_LANGUAGE,
+        "chunk_length": ModelConfig.ASR_CHUNK_LENGTH,
+        "pack_max_duration": ModelConfig.ASR_PACK_MAX_DURATION,
+        "pack_gap_duration": ModelConfig.ASR_PACK_GAP_DURATION
+    })
+    correction_output_path = f"{output_prefix}_correction.parquet"
+    correction_cache_key = get_stage_cache_key({
+        "asr": asr_cache_key,
+        "model": ModelConfig.CORRECTION_MODEL_NAME,
+        "max_length": ModelConfig.CORRECTION_MAX_LENGTH,
+        "load_in_8bit": ModelConfig.LOAD_IN_8BIT,
+        "dtype": str(get_torch_dtype())
+    })
     
-    # 3. Correction
-    print("\n3. CORRECTION STAGE")
-    correction_output_path = f"{output_prefix}_correction.csv"
-    correction_dataframe, correction_metrics = test_correction(
-        asr_output_path, 
-        correction_output_path
-    )
-    all_metrics["correction"] = correction_metrics
+    if not (has_stage_cache("asr", asr_cache_key) or has_stage_cache("correction", correction_cache_key)):
+        # 2-3. Speech Recognition overlapped with Correction
+        print("\n2-3. SPEECH RECOGNITION AND CORRECTION STAGES")
+        asr_dataframe, asr_metrics, correction_dataframe, correction_metrics = run_overlapped_asr_correction(
+            audio_file_path,
+            diarization_output_path,
+            asr_output_path,
+            correction_output_path
+        )
+        all_metrics["asr"] = asr_metrics
+        
+        if asr_dataframe.empty:
+            print("Speech recognition failed - stopping pipeline")
+            return all_metrics
+        
+        upstream_complete = upstream_complete and not has_failures(asr_metrics)
+        if upstream_complete:
+            save_stage_cache("asr", asr_cache_key, asr_dataframe, asr_metrics)
+        
+        upstream_complete = upstream_complete and not has_failures(correction_metrics)
+        if upstream_complete:
+            save_stage_cache("correction", correction_cache_key, correction_dataframe, correction_metrics)
+        all_metrics["correction"] = correction_metrics
+    else:
+        # 2. Speech Recognition
+        print("\n2. SPEECH RECOGNITION STAGE")
+        asr_dataframe, asr_metrics = run_cached_stage(
+            "asr",
+            asr_cache_key,
+            asr_output_path,
+            write_parquet,
+            lambda: perform_speech_recognition(
+                audio_file_path,
+                diarization_output_path,
+                asr_output_path
+            ),
+            upstream_complete
+        )
+        all_metrics["asr"] = asr_metrics
+        upstream_complete = upstream_complete and not has_failures(asr_metrics)
+        
+        if asr_dataframe.empty:
+            print("Speech recognition failed - stopping pipeline")
+            return all_metrics
+        
+        # 3. Correction
+        print("\n3. CORRECTION STAGE")
+        correction_dataframe, correction_metrics = run_cached_stage(
+            "correction",
+            correction_cache_key,
+            correction_output_path,
+            write_parquet,
+            lambda: test_correction(
+                asr_output_path, 
+                correction_output_path
+            ),
+            upstream_complete
+        )
+        all_metrics["correction"] = correction_metrics
+        upstream_complete = upstream_complete and not has_failures(correction_metrics)
     
     # 4. Summarization
     print("\n4. SUMMARIZATION STAGE")
     summarization_output_path = f"{output_prefix}_summarization.csv"
-    summarization_dataframe, summarization_metrics = test_summarization(
-        correction_output_path, 
-        summarization_output_path
+    summarization_cache_key = get_stage_cache_key({
+        "correction": correction_cache_key,
+        "model": ModelConfig.SUMMARIZATION_MODEL_NAME,
+        "num_beams": ModelConfig.SUMMARIZATION_NUM_BEAMS,
+        "max_input_tokens": ModelConfig.MAX_SUMMARY_INPUT_TOKENS,
+        "load_in_8bit": ModelConfig.LOAD_IN_8BIT,
+        "dtype": str(get_torch_dtype(allow_fp16=False))
+    })
+    summarization_dataframe, summarization_metrics = run_cached_stage(
+        "summarization",
+        summarization_cache_key,
+        summarization_output_path,
+        write_csv,
+        lambda: test_summarization(
+            correction_output_path, 
+            summarization_output_path
+        ),
+        upstream_complete
     )
     all_metrics["summarization"] = summarization_metrics
     
     # 5. Create Meeting Minutes
     minutes_output_path = f"{output_prefix}_meeting_minutes.txt"
-    create_meeting_minutes(summarization_output_path, minutes_output_path)
+    create_meeting_minutes(summarization_dataframe, minutes_output_path)
     
     # Save all metrics to JSON
     metrics_output_path = f"{output_prefix}_metrics.json"
-    
-    # Convert metrics to JSON-serializable format
-    json_metrics = convert_metrics_for_json(all_metrics)
-    
-    with open(metrics_output_path, "w", encoding="utf-8") as metrics_file:
-        json.dump(json_metrics, metrics_file, ensure_ascii=False, indent=2)
+    write_json(all_metrics, metrics_output_path)
     
     print("\n" + "=" * 60)
     print("PIPELINE COMPLETED SUCCESSFULLY")
     print("=" * 60)
     
     # Counting total execution time
-    total_pipeline_time = (
-        all_metrics["diarization"]["execution_time"] + 
-        all_metrics["asr"]["execution_time"] + 
-        all_metrics["correction"]["execution_time"] + 
-        all_metrics["summarization"]["execution_time"]
-    )
+    stage_times = np.zeros(len(Stage))
+    for stage in Stage:
+        stage_times[stage] = all_metrics[stage.name.lower()]["execution_time"]
+    total_pipeline_time = stage_times.sum()
     
+    for stage in Stage:
+        print(f"- {STAGE_LABELS[stage]} time: {stage_times[stage]:.2f} seconds")
     print(f"Total pipeline execution time: {total_pipeline_time:.2f} seconds")
     print(f"Final metrics saved to: {metrics_output_path}")
     
@@ -135,7 +397,8 @@ def run_complete_pipeline(audio_file_path, output_prefix="test"):
 
 
 if __name__ == "__main__":
-
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "WARNING"))
+    
     input_audio_file = "audio_test/1.wav"
     
     if not os.path.exists(input_audio_file):
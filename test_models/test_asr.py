@@ -1,12 +1,41 @@
+import logging
 import os
-import sys
 import time
+import numpy as np
 import pandas as pd
-from pydub import AudioSegment
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import soundfile as sf
+from math import gcd
+from scipy.signal import resample_poly
 
+from utils.config import ModelConfig
 from utils.models import load_asr_model
+from utils.serialization import write_parquet
+
+log = logging.getLogger(__name__)
+
+DIARIZATION_COLUMNS = ["speaker", "start_time", "end_time", "duration"]
+
+
+def load_audio(audio_file_path):
+    """Decode audio file once into a mono float32 array at the ASR sampling rate.
+    
+    Args:
+        audio_file_path: Path to input audio file
+        
+    Returns:
+        np.ndarray: Contiguous float32 samples
+    """
+    samples, sampling_rate = sf.read(audio_file_path, dtype="float32", always_2d=False)
+    
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    
+    target_rate = ModelConfig.ASR_SAMPLING_RATE
+    if sampling_rate != target_rate:
+        divisor = gcd(sampling_rate, target_rate)
+        samples = resample_poly(samples, target_rate // divisor, sampling_rate // divisor)
+    
+    return np.ascontiguousarray(samples, dtype=np.float32)
 
 
 def extract_audio_segments(audio_file_path, diarization_dataframe):
@@ -19,127 +48,302 @@ def extract_audio_segments(audio_file_path, diarization_dataframe):
     Returns:
         list: List of dictionaries with segment information and audio data
     """
-    audio = AudioSegment.from_file(audio_file_path)
+    samples = load_audio(audio_file_path)
+    sampling_rate = ModelConfig.ASR_SAMPLING_RATE
+    start_samples = (diarization_dataframe["start_time"].to_numpy() * sampling_rate).astype(np.int64)
+    end_samples = (diarization_dataframe["end_time"].to_numpy() * sampling_rate).astype(np.int64)
     segments = []
     
-    for index, row in diarization_dataframe.iterrows():
-        start_ms = int(row["start_time"] * 1000)
-        end_ms = int(row["end_time"] * 1000)
-        segment_audio = audio[start_ms:end_ms]
-        
+    for row, start_sample, end_sample in zip(
+        diarization_dataframe.itertuples(), 
+        start_samples, 
+        end_samples
+    ):
         segments.append({
-            "speaker": row["speaker"],
-            "start_time": row["start_time"],
-            "end_time": row["end_time"],
-            "duration": row["duration"],
-            "audio_segment": segment_audio,
-            "segment_index": index
+            "speaker": row.speaker,
+            "start_time": row.start_time,
+            "end_time": row.end_time,
+            "duration": row.duration,
+            "audio_array": samples[start_sample:end_sample],
+            "segment_index": row.Index
         })
     
     return segments
 
 
-def transcribe_audio_segments(segments, asr_pipeline):
-    """Transcribe audio segments using ASR model.
+def pack_segments(segments, max_duration=None):
+    """Pack consecutive same-speaker segments into longer ASR inputs.
+    
+    Segments are joined with short silence gaps up to max_duration seconds,
+    so the ASR encoder processes fewer, fuller windows.
     
     Args:
         segments: List of audio segments
-        asr_pipeline: Loaded ASR pipeline
+        max_duration: Maximum packed input duration in seconds
         
     Returns:
-        list: List of transcription results
+        list: List of dictionaries with packed audio, segment offsets and
+            diarization indices of the packed segments
     """
-    results = []
+    if max_duration is None:
+        max_duration = ModelConfig.ASR_PACK_MAX_DURATION
+    
+    sampling_rate = ModelConfig.ASR_SAMPLING_RATE
+    gap_duration = ModelConfig.ASR_PACK_GAP_DURATION
+    gap = np.zeros(int(gap_duration * sampling_rate), dtype=np.float32)
+    packs = []
+    current_pack = None
     
-    for segment in segments:
-        temp_file = f"temp_{segment['speaker']}_{segment['segment_index']}.wav"
+    for position, segment in enumerate(segments):
+        segment_duration = len(segment["audio_array"]) / sampling_rate
         
+        if (
+            current_pack is not None
+            and current_pack["speaker"] == segment["speaker"]
+            and current_pack["duration"] + gap_duration + segment_duration <= max_duration
+        ):
+            current_pack["arrays"].append(gap)
+            offset = current_pack["duration"] + gap_duration
+        else:
+            current_pack = {
+                "speaker": segment["speaker"],
+                "arrays": [],
+                "offsets": [],
+                "segment_indices": [],
+                "duration": 0.0
+            }
+            packs.append(current_pack)
+            offset = 0.0
+        
+        current_pack["arrays"].append(segment["audio_array"])
+        current_pack["offsets"].append((position, offset))
+        current_pack["segment_indices"].append(segment["segment_index"])
+        current_pack["duration"] = offset + segment_duration
+    
+    for pack in packs:
+        pack["audio"] = np.concatenate(pack.pop("arrays"))
+    
+    return packs
+
+
+def split_packed_transcription(pack, asr_result):
+    """Split packed transcription back into per-segment texts.
+    
+    Each word is assigned to the segment its timestamp midpoint falls into.
+    
+    Args:
+        pack: Packed input produced by pack_segments
+        asr_result: ASR output with word-level chunks
+        
+    Returns:
+        dict: Mapping of segment position to transcribed text
+    """
+    positions = [position for position, _ in pack["offsets"]]
+    
+    if len(positions) == 1 or not asr_result.get("chunks"):
+        return {positions[0]: asr_result["text"]}
+    
+    offsets = np.array([offset for _, offset in pack["offsets"]])
+    segment_words = {position: [] for position in positions}
+    
+    for chunk in asr_result["chunks"]:
+        word_start, word_end = chunk["timestamp"]
+        if word_end is None:
+            word_end = word_start
+        midpoint = (word_start + word_end) / 2
+        segment_number = max(int(np.searchsorted(offsets, midpoint, side="right")) - 1, 0)
+        segment_words[positions[segment_number]].append(chunk["text"])
+    
+    return {position: "".join(words) for position, words in segment_words.items()}
+
+
+def _run_asr(packs, asr_pipeline):
+    """Run the ASR pipeline on a list of packed inputs."""
+    inputs = [
+        {"raw": pack["audio"], "sampling_rate": ModelConfig.ASR_SAMPLING_RATE}
+        for pack in packs
+    ]
+    return asr_pipeline(
+        inputs,
+        batch_size=ModelConfig.ASR_BATCH_SIZE,
+        chunk_length_s=ModelConfig.ASR_CHUNK_LENGTH,
+        return_timestamps="word"
+    )
+
+
+def transcribe_packs(packs, asr_pipeline):
+    """Transcribe a batch of packed inputs.
+    
+    Falls back to per-pack transcription if the batch fails.
+    
+    Args:
+        packs: List of packed inputs produced by pack_segments
+        asr_pipeline: Loaded ASR pipeline
+        
+    Returns:
+        list: ASR output per pack, or None for packs that failed
+    """
+    try:
+        return _run_asr(packs, asr_pipeline)
+    except Exception as error:
+        log.error("Error processing segments batch, retrying per pack: %s", error)
+    
+    asr_outputs = []
+    for pack in packs:
         try:
-            segment["audio_segment"].export(temp_file, format="wav")
-            asr_result = asr_pipeline(temp_file)
-            text = asr_result["text"].strip()
+            asr_outputs.append(_run_asr([pack], asr_pipeline)[0])
+        except Exception as error:
+            log.error("Error processing segments %s: %s", pack["segment_indices"], error)
+            asr_outputs.append(None)
+    return asr_outputs
+
+
+def iter_transcribed_segments(segments, asr_pipeline):
+    """Transcribe audio segments batch by batch.
+    
+    Consecutive same-speaker segments are packed into longer inputs and passed
+    to the pipeline as raw 16 kHz arrays, ModelConfig.ASR_BATCH_SIZE at a time.
+    
+    Args:
+        segments: List of audio segments
+        asr_pipeline: Loaded ASR pipeline
+        
+    Yields:
+        tuple: (transcription results of segments covered by one batch,
+            number of segments that failed to transcribe)
+    """
+    packs = pack_segments(segments)
+    batch_size = ModelConfig.ASR_BATCH_SIZE
+    
+    for batch_start in range(0, len(packs), batch_size):
+        batch_packs = packs[batch_start:batch_start + batch_size]
+        asr_outputs = transcribe_packs(batch_packs, asr_pipeline)
+        
+        batch_results = []
+        failed_segments = 0
+        for pack, asr_result in zip(batch_packs, asr_outputs):
+            if asr_result is None:
+                failed_segments += len(pack["offsets"])
+                continue
+            
+            segment_texts = split_packed_transcription(pack, asr_result)
             
-            if text and text not in ["", ".", "..."]:
-                segment_result = {
-                    "speaker": segment["speaker"],
-                    "start_time": segment["start_time"],
-                    "end_time": segment["end_time"],
-                    "duration": segment["duration"],
-                    "text": text,
-                    "word_count": len(text.split())
-                }
-                results.append(segment_result)
-                print(f"{segment['speaker']} [{segment['start_time']:.1f}s]: {text}")
-            else:
-                print(f"{segment['speaker']} [{segment['start_time']:.1f}s]: No speech detected")
+            for position, _ in pack["offsets"]:
+                segment = segments[position]
+                text = segment_texts.get(position, "").strip()
                 
-        except Exception as error:
-            print(f"Error processing segment {segment['segment_index']}: {error}")
+                if text and text not in ["", ".", "..."]:
+                    segment_result = {
+                        "speaker": segment["speaker"],
+                        "start_time": segment["start_time"],
+                        "end_time": segment["end_time"],
+                        "duration": segment["duration"],
+                        "text": text,
+                        "word_count": len(text.split())
+                    }
+                    batch_results.append(segment_result)
+                    log.debug("%s [%.1fs]: %s", segment["speaker"], segment["start_time"], text)
+                else:
+                    log.debug("%s [%.1fs]: No speech detected", segment["speaker"], segment["start_time"])
         
-        finally:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+        yield batch_results, failed_segments
+
+
+def transcribe_audio_segments(segments, asr_pipeline):
+    """Transcribe audio segments using ASR model.
+    
+    Args:
+        segments: List of audio segments
+        asr_pipeline: Loaded ASR pipeline
+        
+    Returns:
+        tuple: (list of transcription results, number of failed segments)
+    """
+    results = []
+    failed_segments = 0
+    for batch_results, batch_failed_segments in iter_transcribed_segments(segments, asr_pipeline):
+        results.extend(batch_results)
+        failed_segments += batch_failed_segments
+    return results, failed_segments
+
+
+def build_asr_metrics(results_dataframe, segments_count, failed_segments, execution_time):
+    """Collect speech recognition metrics.
     
-    return results
+    Args:
+        results_dataframe: Non-empty DataFrame with transcription results
+        segments_count: Number of segments sent to ASR
+        failed_segments: Number of segments whose transcription raised an error
+        execution_time: Stage execution time in seconds
+        
+    Returns:
+        dict: Dictionary with metrics
+    """
+    return {
+        "execution_time": float(execution_time),
+        "segments_processed": int(segments_count),
+        "failed_segments": int(failed_segments),
+        "segments_with_speech": int(len(results_dataframe)),
+        "success_rate": float(len(results_dataframe) / segments_count if segments_count > 0 else 0),
+        "total_words": int(results_dataframe["word_count"].sum()),
+        "speakers_count": int(results_dataframe["speaker"].nunique())
+    }
 
 
-def perform_speech_recognition(audio_file_path, diarization_csv_path, output_csv_path="asr_results.csv"):
+def perform_speech_recognition(audio_file_path, diarization_path, output_path="asr_results.parquet", asr_pipeline=None):
     """Perform speech recognition on diarized segments.
     
     Args:
         audio_file_path: Path to input audio file
-        diarization_csv_path: Path to CSV with diarization results
-        output_csv_path: Path for output CSV file
+        diarization_path: Path to Parquet file with diarization results
+        output_path: Path for output Parquet file
+        asr_pipeline: Preloaded ASR pipeline (loaded if None)
         
     Returns:
         tuple: (DataFrame with transcription results, dictionary with metrics)
     """
     start_time = time.time()
     
-    print("Loading ASR model...")
-    asr_pipeline = load_asr_model()
+    if asr_pipeline is None:
+        log.info("Loading ASR model...")
+        asr_pipeline = load_asr_model()
     
-    print("Loading diarization results...")
-    diarization_dataframe = pd.read_csv(diarization_csv_path)
+    log.info("Loading diarization results...")
+    diarization_dataframe = pd.read_parquet(diarization_path, columns=DIARIZATION_COLUMNS)
     
-    print("Extracting audio segments...")
+    log.info("Extracting audio segments...")
     audio_segments = extract_audio_segments(audio_file_path, diarization_dataframe)
     
-    print(f"Transcribing {len(audio_segments)} segments...")
-    transcription_results = transcribe_audio_segments(audio_segments, asr_pipeline)
+    log.info("Transcribing %d segments...", len(audio_segments))
+    transcription_results, failed_segments = transcribe_audio_segments(audio_segments, asr_pipeline)
     
     results_dataframe = pd.DataFrame(transcription_results)
     execution_time = time.time() - start_time
     
     if not results_dataframe.empty:
         results_dataframe = results_dataframe.sort_values("start_time").reset_index(drop=True)
-        results_dataframe.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
-        
-        metrics = {
-            "execution_time": float(execution_time),
-            "segments_processed": int(len(audio_segments)),
-            "segments_with_speech": int(len(results_dataframe)),
-            "success_rate": float(len(results_dataframe) / len(audio_segments) if len(audio_segments) > 0 else 0),
-            "total_words": int(results_dataframe["word_count"].sum()),
-            "speakers_count": int(results_dataframe["speaker"].nunique())
-        }
-        
-        print(f"Speech recognition completed in {execution_time:.2f} seconds")
-        print(f"Segments processed: {metrics['segments_processed']}")
-        print(f"Segments with speech: {metrics['segments_with_speech']}")
-        print(f"Success rate: {metrics['success_rate']:.2%}")
-        print(f"Total words recognized: {metrics['total_words']}")
+        write_parquet(results_dataframe, output_path)
+        
+        metrics = build_asr_metrics(results_dataframe, len(audio_segments), failed_segments, execution_time)
+        
+        log.info("Speech recognition completed in %.2f seconds", execution_time)
+        log.info("Segments processed: %d", metrics["segments_processed"])
+        log.info("Segments with speech: %d", metrics["segments_with_speech"])
+        log.info("Success rate: %.2f%%", metrics["success_rate"] * 100)
+        log.info("Total words recognized: %d", metrics["total_words"])
         
         return results_dataframe, metrics
     
-    print("No speech recognized in any segments")
+    log.warning("No speech recognized in any segments")
     return pd.DataFrame(), {"execution_time": execution_time, "segments_processed": len(audio_segments)}
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "WARNING"))
+    
     audio_file = "1.wav"
     dataframe, performance_metrics = perform_speech_recognition(
         audio_file, 
-        "diarization_results.csv", 
-        "test_asr_results.csv"
+        "diarization_results.parquet", 
+        "test_asr_results.parquet"
     )
\ No newline at end of file
@@ -1,11 +1,36 @@
-import time
-import sys
+import logging
 import os
+import time
 import pandas as pd
+import torch
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+from utils.config import ModelConfig
 from utils.models import load_correction_model
+from utils.serialization import write_parquet
+
+log = logging.getLogger(__name__)
+
+
+def _generate_corrections(input_texts, correction_model, correction_tokenizer):
+    """Run a single batched generate() call over a list of texts."""
+    encodings = correction_tokenizer(
+        input_texts,
+        padding=True,
+        truncation=True,
+        max_length=ModelConfig.CORRECTION_MAX_LENGTH,
+        return_tensors="pt"
+    ).to(correction_model.device)
+    with torch.inference_mode():
+        generated_tokens = correction_model.generate(
+            **encodings, 
+            forced_bos_token_id=correction_tokenizer.get_lang_id(ModelConfig.CORRECTION_TGT_LANG),
+            num_beams=1,
+            max_new_tokens=encodings.input_ids.shape[1] + 16
+        )
+    return correction_tokenizer.batch_decode(
+        generated_tokens, 
+        skip_special_tokens=True
+    )
 
 
 def correct_text(input_text, correction_model, correction_tokenizer):
@@ -20,89 +45,136 @@ def correct_text(input_text, correction_model, correction_tokenizer):
         tuple: (corrected_text, success_status)
     """
     try:
-        encodings = correction_tokenizer(input_text, return_tensors="pt")
-        generated_tokens = correction_model.generate(
-            **encodings, 
-            forced_bos_token_id=correction_tokenizer.get_lang_id("ru")
-        )
-        corrected_text = correction_tokenizer.batch_decode(
-            generated_tokens, 
-            skip_special_tokens=True
-        )[0]
+        corrected_text = _generate_corrections([input_text], correction_model, correction_tokenizer)[0]
         return corrected_text, True
     except Exception as error:
-        print(f"Error correcting text: {error}")
+        log.error("Error correcting text: %s", error)
         return input_text, False
 
 
-def test_correction(input_csv_path="diarization_results.csv", output_csv_path="correction_results.csv"):
+def correct_texts_batch(input_texts, correction_model, correction_tokenizer):
+    """Correct a batch of texts with one generate() call.
+    
+    Falls back to per-text correction if the batch fails.
+    
+    Args:
+        input_texts: List of texts to correct
+        correction_model: Loaded correction model
+        correction_tokenizer: Loaded correction tokenizer
+        
+    Returns:
+        list: List of (corrected_text, success_status) tuples
+    """
+    try:
+        corrected_texts = _generate_corrections(input_texts, correction_model, correction_tokenizer)
+        return [(corrected_text, True) for corrected_text in corrected_texts]
+    except Exception as error:
+        log.error("Error correcting batch, retrying per segment: %s", error)
+        return [correct_text(text, correction_model, correction_tokenizer) for text in input_texts]
+
+
+def build_correction_metrics(corrected_dataframe, successful_corrections, processing_times, execution_time):
+    """Collect text correction metrics.
+    
+    Args:
+        corrected_dataframe: DataFrame with original and corrected texts
+        successful_corrections: Number of successfully corrected segments
+        processing_times: Per-segment processing times in seconds
+        execution_time: Stage execution time in seconds
+        
+    Returns:
+        dict: Dictionary with metrics
+    """
+    return {
+        "execution_time": float(execution_time),
+        "segments_count": int(len(corrected_dataframe)),
+        "successful_corrections": int(successful_corrections),
+        "failed_segments": int(len(corrected_dataframe) - successful_corrections),
+        "success_rate": float(successful_corrections / len(corrected_dataframe) if len(corrected_dataframe) > 0 else 0),
+        "avg_processing_time_per_segment": float(
+            sum(processing_times) / len(processing_times) if processing_times else 0
+        ),
+        "total_characters_processed": int(sum(len(text) for text in corrected_dataframe["text"]))
+    }
+
+
+def test_correction(
+    input_path="asr_results.parquet",
+    output_path="correction_results.parquet",
+    correction_model=None,
+    correction_tokenizer=None
+):
     """Test text correction model on diarization results.
     
     Args:
-        input_csv_path: Path to input CSV with diarization results
-        output_csv_path: Path for output CSV with corrected texts
+        input_path: Path to input Parquet file with transcriptions
+        output_path: Path for output Parquet file with corrected texts
+        correction_model: Preloaded correction model (loaded if None)
+        correction_tokenizer: Preloaded correction tokenizer (loaded if None)
         
     Returns:
         tuple: (DataFrame with corrected texts, dictionary with metrics)
     """
     start_time = time.time()
     
-    print("Loading correction model...")
-    correction_model, correction_tokenizer = load_correction_model()
+    if correction_model is None or correction_tokenizer is None:
+        log.info("Loading correction model...")
+        correction_model, correction_tokenizer = load_correction_model()
     
-    input_dataframe = pd.read_csv(input_csv_path, encoding="utf-8-sig")
+    input_dataframe = pd.read_parquet(input_path)
     
-    print(f"Correcting {len(input_dataframe)} segments...")
+    log.info("Correcting %d segments...", len(input_dataframe))
     
+    texts = input_dataframe["text"].tolist()
+    batch_size = ModelConfig.CORRECTION_BATCH_SIZE
     corrected_texts = []
     successful_corrections = 0
     processing_times = []
     
-    for index, text in enumerate(input_dataframe["text"]):
-        print(f"Correcting segment {index + 1}/{len(input_dataframe)}...")
+    for batch_start in range(0, len(texts), batch_size):
+        batch_texts = texts[batch_start:batch_start + batch_size]
+        log.debug("Correcting segments %d-%d/%d...", batch_start + 1, batch_start + len(batch_texts), len(texts))
         
-        segment_start_time = time.time()
-        corrected_text, success_status = correct_text(
-            text, 
+        batch_start_time = time.time()
+        batch_results = correct_texts_batch(
+            batch_texts, 
             correction_model, 
             correction_tokenizer
         )
-        segment_processing_time = time.time() - segment_start_time
-        processing_times.append(segment_processing_time)
+        batch_processing_time = time.time() - batch_start_time
+        processing_times.extend([batch_processing_time / len(batch_texts)] * len(batch_texts))
         
-        corrected_texts.append(corrected_text)
-        if success_status:
-            successful_corrections += 1
+        for text, (corrected_text, success_status) in zip(batch_texts, batch_results):
+            corrected_texts.append(corrected_text)
+            if success_status:
+                successful_corrections += 1
+            
+            log.debug("Original: %s\nCorrected: %s", text, corrected_text)
         
-        print(f"Original: {text}")
-        print(f"Corrected: {corrected_text}")
-        print(f"Processing time: {segment_processing_time:.2f} seconds")
-        print("---")
+        log.debug("Batch processing time: %.2f seconds", batch_processing_time)
     
     input_dataframe["corrected_text"] = corrected_texts
-    input_dataframe.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+    write_parquet(input_dataframe, output_path)
     
     total_execution_time = time.time() - start_time
-    metrics = {
-        "execution_time": float(total_execution_time),
-        "segments_count": int(len(input_dataframe)),
-        "successful_corrections": int(successful_corrections),
-        "success_rate": float(successful_corrections / len(input_dataframe) if len(input_dataframe) > 0 else 0),
-        "avg_processing_time_per_segment": float(
-            sum(processing_times) / len(processing_times) if processing_times else 0
-        ),
-        "total_characters_processed": int(sum(len(text) for text in input_dataframe["text"]))
-    }
+    metrics = build_correction_metrics(
+        input_dataframe, 
+        successful_corrections, 
+        processing_times, 
+        total_execution_time
+    )
     
-    print(f"Correction completed in {total_execution_time:.2f} seconds")
-    print(f"Success rate: {metrics['success_rate']:.2%}")
-    print(f"Average time per segment: {metrics['avg_processing_time_per_segment']:.2f} seconds")
+    log.info("Correction completed in %.2f seconds", total_execution_time)
+    log.info("Success rate: %.2f%%", metrics["success_rate"] * 100)
+    log.info("Average time per segment: %.2f seconds", metrics["avg_processing_time_per_segment"])
     
     return input_dataframe, metrics
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "WARNING"))
+    
     result_dataframe, performance_metrics = test_correction(
-        "diarization_results.csv", 
-        "test_correction_results.csv"
+        "asr_results.parquet", 
+        "test_correction_results.parquet"
     )
\ No newline at end of file
@@ -1,55 +1,64 @@
-import time
-import sys
+import logging
 import os
+import time
+import numpy as np
 import pandas as pd
 from pyannote.audio import Pipeline
-from pydub import AudioSegment
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.config import ModelConfig
 from utils.models import load_diarization_model
+from utils.serialization import write_parquet
 
+log = logging.getLogger(__name__)
 
-def perform_diarization(audio_file_path, output_csv_path="diarization_results.csv"):
+
+def perform_diarization(
+    audio_file_path,
+    output_path="diarization_results.parquet",
+    diarization_pipeline=None
+):
     """Perform speaker diarization on audio file.
     
     Args:
         audio_file_path: Path to input audio file
-        output_csv_path: Path for output CSV file
+        output_path: Path for output Parquet file
+        diarization_pipeline: Preloaded diarization pipeline (loaded if None)
         
     Returns:
         tuple: (DataFrame with diarization results, dictionary with metrics)
     """
     start_time = time.time()
     
-    print("Loading diarization model...")
-    diarization_pipeline = load_diarization_model()
+    if diarization_pipeline is None:
+        log.info("Loading diarization model...")
+        diarization_pipeline = load_diarization_model()
     
-    print("Performing diarization...")
+    log.info("Performing diarization...")
     diarization = diarization_pipeline(audio_file_path)
-    audio = AudioSegment.from_file(audio_file_path)
     
-    segments = []
+    tracks = list(diarization.speaker_diarization.itertracks(yield_label=True))
+    start_times = np.fromiter((turn.start for turn, _, _ in tracks), dtype=float, count=len(tracks))
+    end_times = np.fromiter((turn.end for turn, _, _ in tracks), dtype=float, count=len(tracks))
+    
+    results_dataframe = pd.DataFrame({
+        "speaker": [speaker for _, _, speaker in tracks],
+        "start_time": start_times,
+        "end_time": end_times,
+        "duration": end_times - start_times
+    })
+    results_dataframe = results_dataframe[
+        results_dataframe["duration"] >= ModelConfig.MIN_SEGMENT_DURATION
+    ]
     
-    for turn, _, speaker in diarization.speaker_diarization.itertracks(yield_label=True):
-        if turn.end - turn.start < ModelConfig.MIN_SEGMENT_DURATION:
-            continue
-            
-        segments.append({
-            "speaker": speaker,
-            "start_time": turn.start,
-            "end_time": turn.end,
-            "duration": turn.end - turn.start
-        })
-        print(f"{speaker} [{turn.start:.1f}s - {turn.end:.1f}s]")
+    if log.isEnabledFor(logging.DEBUG):
+        for row in results_dataframe.itertuples(index=False):
+            log.debug("%s [%.1fs - %.1fs]", row.speaker, row.start_time, row.end_time)
     
-    results_dataframe = pd.DataFrame(segments)
     execution_time = time.time() - start_time
     
     if not results_dataframe.empty:
         results_dataframe = results_dataframe.sort_values("start_time").reset_index(drop=True)
-        results_dataframe.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+        write_parquet(results_dataframe, output_path)
         
         metrics = {
             "execution_time": float(execution_time),
@@ -58,16 +67,18 @@ def perform_diarization(audio_file_path, output_csv_path="diarization_results.cs
             "audio_duration": float(results_dataframe["end_time"].max())
         }
         
-        print(f"Diarization completed in {execution_time:.2f} seconds")
-        print(f"Segments found: {metrics['segments_count']}")
-        print(f"Unique speakers: {metrics['speakers_count']}")
+        log.info("Diarization completed in %.2f seconds", execution_time)
+        log.info("Segments found: %d", metrics["segments_count"])
+        log.info("Unique speakers: %d", metrics["speakers_count"])
         
         return results_dataframe, metrics
     
-    print("No speech segments found")
+    log.warning("No speech segments found")
     return pd.DataFrame(), {"execution_time": execution_time, "segments_count": 0}
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "WARNING"))
+    
     audio_file = "1.wav"
-    dataframe, performance_metrics = perform_diarization(audio_file, "test_diarization_results.csv")
\ No newline at end of file
+    dataframe, performance_metrics = perform_diarization(audio_file, "test_diarization_results.parquet")
\ No newline at end of file
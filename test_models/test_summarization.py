@@ -1,69 +1,90 @@
+import logging
+import os
 import time
 import pandas as pd
 import torch
-import os
-import sys
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.config import ModelConfig, get_device
+from utils.config import ModelConfig
 from utils.models import load_summarization_model
+from utils.serialization import write_csv
+
+log = logging.getLogger(__name__)
+
+SUMMARIZATION_PROMPT = "<LM> Сократи текст.\n"
 
 
 def summarize_text(input_text, summarization_model, summarization_tokenizer):
     """Summarize text using the summarization model.
     
+    The prompt is truncated to ModelConfig.MAX_SUMMARY_INPUT_TOKENS tokens.
+    
     Args:
         input_text: Text to summarize
         summarization_model: Loaded summarization model
         summarization_tokenizer: Loaded summarization tokenizer
         
     Returns:
-        tuple: (summary_text, success_status)
+        tuple: (summary_text, success_status, input_token_count, summary_token_count),
+            where input_token_count excludes the instruction prompt
     """
     try:
-        prompt_text = f"<LM> Сократи текст.\n {input_text}"
-        input_ids = torch.tensor([summarization_tokenizer.encode(prompt_text)]).to(get_device())
+        prompt_text = f"{SUMMARIZATION_PROMPT} {input_text}"
+        input_ids = summarization_tokenizer.encode(
+            prompt_text,
+            return_tensors="pt",
+            truncation=True,
+            max_length=ModelConfig.MAX_SUMMARY_INPUT_TOKENS
+        ).to(summarization_model.device)
         
-        outputs = summarization_model.generate(
-            input_ids,
-            eos_token_id=summarization_tokenizer.eos_token_id,
-            num_beams=5,
-            min_new_tokens=17,
-            max_new_tokens=200,
-            do_sample=True,
-            no_repeat_ngram_size=4,
-            top_p=0.9
-        )
+        with torch.inference_mode():
+            outputs = summarization_model.generate(
+                input_ids,
+                eos_token_id=summarization_tokenizer.eos_token_id,
+                num_beams=ModelConfig.SUMMARIZATION_NUM_BEAMS,
+                min_new_tokens=17,
+                max_new_tokens=200,
+                do_sample=False,
+                no_repeat_ngram_size=4,
+                use_cache=True
+            )
         
         summary = summarization_tokenizer.decode(outputs[0][1:], skip_special_tokens=True)
-        return summary.strip(), True
+        input_token_count = input_ids.shape[1] - len(summarization_tokenizer.encode(SUMMARIZATION_PROMPT))
+        return summary.strip(), True, input_token_count, outputs.shape[1] - 1
         
     except Exception as error:
-        print(f"Error summarizing text: {error}")
-        return input_text[:200] + "...", False
+        log.error("Error summarizing text: %s", error)
+        return input_text[:200] + "...", False, 0, 0
 
 
-def test_summarization(input_csv_path="correction_results.csv", output_csv_path="summarization_results.csv"):
+def test_summarization(
+    input_path="correction_results.parquet",
+    output_csv_path="summarization_results.csv",
+    summarization_model=None,
+    summarization_tokenizer=None
+):
     """Test text summarization model on corrected texts.
     
     Args:
-        input_csv_path: Path to input CSV with corrected texts
+        input_path: Path to input Parquet file with corrected texts
         output_csv_path: Path for output CSV with summaries
+        summarization_model: Preloaded summarization model (loaded if None)
+        summarization_tokenizer: Preloaded summarization tokenizer (loaded if None)
         
     Returns:
         tuple: (DataFrame with summaries, dictionary with metrics)
     """
     start_time = time.time()
     
-    print("Loading summarization model...")
-    summarization_model, summarization_tokenizer = load_summarization_model()
+    if summarization_model is None or summarization_tokenizer is None:
+        log.info("Loading summarization model...")
+        summarization_model, summarization_tokenizer = load_summarization_model()
     
-    input_dataframe = pd.read_csv(input_csv_path, encoding="utf-8-sig")
+    input_dataframe = pd.read_parquet(input_path)
     
     speaker_texts = input_dataframe.groupby("speaker")["corrected_text"].apply(" ".join).reset_index()
     
-    print(f"Summarizing texts for {len(speaker_texts)} speakers...")
+    log.info("Summarizing texts for %d speakers...", len(speaker_texts))
     
     summaries = []
     successful_summaries = 0
@@ -74,26 +95,21 @@ def test_summarization(input_csv_path="correction_results.csv", output_csv_path=
         speaker = row["speaker"]
         original_text = row["corrected_text"]
         
-        print(f"Summarizing for {speaker}...")
-        
-        processed_text = original_text
-        if len(original_text) > ModelConfig.MAX_SUMMARY_INPUT_LENGTH:
-            processed_text = original_text[:ModelConfig.MAX_SUMMARY_INPUT_LENGTH] + "..."
+        log.debug("Summarizing for %s...", speaker)
         
         segment_start_time = time.time()
-        summary_text, success_status = summarize_text(
-            processed_text, 
+        summary_text, success_status, input_token_count, summary_token_count = summarize_text(
+            original_text, 
             summarization_model, 
             summarization_tokenizer
         )
         segment_processing_time = time.time() - segment_start_time
         processing_times.append(segment_processing_time)
         
+        compression_ratio = summary_token_count / input_token_count if input_token_count > 0 else 0
         if success_status:
             successful_summaries += 1
-            
-        compression_ratio = len(summary_text) / len(original_text) if len(original_text) > 0 else 0
-        compression_ratios.append(compression_ratio)
+            compression_ratios.append(compression_ratio)
         
         summaries.append({
             "speaker": speaker,
@@ -103,21 +119,25 @@ def test_summarization(input_csv_path="correction_results.csv", output_csv_path=
             "summary": summary_text
         })
         
-        print(f"Original text length: {len(original_text)}")
-        print(f"Summary length: {len(summary_text)}")
-        print(f"Compression ratio: {compression_ratio:.2f}")
-        print(f"Summary: {summary_text}")
-        print(f"Processing time: {segment_processing_time:.2f} seconds")
-        print("---")
+        log.debug(
+            "Original text length: %d, summary length: %d, compression ratio: %.2f, "
+            "processing time: %.2f seconds\nSummary: %s",
+            len(original_text),
+            len(summary_text),
+            compression_ratio,
+            segment_processing_time,
+            summary_text
+        )
     
     summary_dataframe = pd.DataFrame(summaries)
-    summary_dataframe.to_csv(output_csv_path, index=False, encoding="utf-8-sig")
+    write_csv(summary_dataframe, output_csv_path)
     
     total_execution_time = time.time() - start_time
     metrics = {
         "execution_time": float(total_execution_time),
         "speakers_count": int(len(speaker_texts)),
         "successful_summaries": int(successful_summaries),
+        "failed_speakers": int(len(speaker_texts) - successful_summaries),
         "success_rate": float(successful_summaries / len(speaker_texts) if len(speaker_texts) > 0 else 0),
         "avg_processing_time_per_speaker": float(
             sum(processing_times) / len(processing_times) if processing_times else 0
@@ -128,40 +148,52 @@ def test_summarization(input_csv_path="correction_results.csv", output_csv_path=
         "total_characters_processed": int(sum(row["original_text_length"] for row in summaries))
     }
     
-    print(f"Summarization completed in {total_execution_time:.2f} seconds")
-    print(f"Success rate: {metrics['success_rate']:.2%}")
-    print(f"Average compression ratio: {metrics['avg_compression_ratio']:.2f}")
-    print(f"Average time per speaker: {metrics['avg_processing_time_per_speaker']:.2f} seconds")
+    log.info("Summarization completed in %.2f seconds", total_execution_time)
+    log.info("Success rate: %.2f%%", metrics["success_rate"] * 100)
+    log.info("Average compression ratio: %.2f", metrics["avg_compression_ratio"])
+    log.info("Average time per speaker: %.2f seconds", metrics["avg_processing_time_per_speaker"])
     
     return summary_dataframe, metrics
 
 
-def create_meeting_minutes(summary_csv_path="summarization_results.csv", output_file_path="meeting_minutes.txt"):
+def create_meeting_minutes(summary_data="summarization_results.csv", output_file_path="meeting_minutes.txt"):
     """Create meeting minutes from speaker summaries.
     
     Args:
-        summary_csv_path: Path to CSV with speaker summaries
+        summary_data: DataFrame with speaker summaries or path to its CSV file
         output_file_path: Path for output meeting minutes file
     """
-    summary_dataframe = pd.read_csv(summary_csv_path, encoding="utf-8-sig")
+    if isinstance(summary_data, pd.DataFrame):
+        summary_dataframe = summary_data
+    else:
+        summary_dataframe = pd.read_csv(summary_data, encoding="utf-8-sig")
+    
+    speaker_sections = [
+        f"СПИКЕР: {speaker}\n"
+        f"КЛЮЧЕВЫЕ ТЕЗИСЫ:\n"
+        f"{summary}\n"
+        + "-" * 50 + "\n"
+        for speaker, summary in zip(
+            summary_dataframe["speaker"].to_numpy(), 
+            summary_dataframe["summary"].to_numpy()
+        )
+    ]
+    minutes_text = "ПРОТОКОЛ ВСТРЕЧИ\n" + "=" * 50 + "\n\n" + "\n".join(speaker_sections)
+    if speaker_sections:
+        minutes_text += "\n"
     
     with open(output_file_path, "w", encoding="utf-8") as output_file:
-        output_file.write("ПРОТОКОЛ ВСТРЕЧИ\n")
-        output_file.write("=" * 50 + "\n\n")
-        
-        for _, row in summary_dataframe.iterrows():
-            output_file.write(f"СПИКЕР: {row['speaker']}\n")
-            output_file.write(f"КЛЮЧЕВЫЕ ТЕЗИСЫ:\n")
-            output_file.write(f"{row['summary']}\n")
-            output_file.write("-" * 50 + "\n\n")
+        output_file.write(minutes_text)
     
-    print(f"Meeting minutes saved to {output_file_path}")
+    log.info("Meeting minutes saved to %s", output_file_path)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "WARNING"))
+    
     result_dataframe, performance_metrics = test_summarization(
-        "correction_results.csv", 
+        "correction_results.parquet", 
         "test_summarization_results.csv"
     )
     
-    create_meeting_minutes("test_summarization_results.csv", "test_meeting_minutes.txt")
\ No newline at end of file
+    create_meeting_minutes(result_dataframe, "test_meeting_minutes.txt")
\ No newline at end of file
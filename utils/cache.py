@@ -0,0 +1,94 @@
+import hashlib
+import os
+import orjson
+import pandas as pd
+
+from .config import ModelConfig
+from .serialization import write_json, write_parquet
+
+
+def hash_file(file_path, chunk_size=1 << 20):
+    """Compute content hash of a file.
+    
+    Args:
+        file_path: Path to file
+        chunk_size: Read chunk size in bytes
+        
+    Returns:
+        str: Hex digest of file content
+    """
+    digest = hashlib.blake2b()
+    with open(file_path, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_stage_cache_key(key_dict):
+    """Build cache key from stage inputs and model configuration.
+    
+    Args:
+        key_dict: JSON-serializable dictionary describing stage inputs
+        
+    Returns:
+        str: Hex digest identifying the stage output
+    """
+    serialized_key = orjson.dumps(key_dict, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(serialized_key).hexdigest()
+
+
+def _get_stage_cache_paths(stage_name, cache_key):
+    stage_directory = os.path.join(ModelConfig.CACHE_DIR, stage_name)
+    return (
+        os.path.join(stage_directory, f"{cache_key}.parquet"),
+        os.path.join(stage_directory, f"{cache_key}.json")
+    )
+
+
+def has_stage_cache(stage_name, cache_key):
+    """Check whether stage output is cached.
+    
+    Args:
+        stage_name: Pipeline stage name
+        cache_key: Key returned by get_stage_cache_key
+        
+    Returns:
+        bool: True if both data and metrics are cached
+    """
+    return all(os.path.exists(path) for path in _get_stage_cache_paths(stage_name, cache_key))
+
+
+def load_stage_cache(stage_name, cache_key):
+    """Load cached stage output.
+    
+    Args:
+        stage_name: Pipeline stage name
+        cache_key: Key returned by get_stage_cache_key
+        
+    Returns:
+        tuple: (DataFrame, metrics dictionary) or None if not cached
+    """
+    if not has_stage_cache(stage_name, cache_key):
+        return None
+    
+    data_path, metrics_path = _get_stage_cache_paths(stage_name, cache_key)
+    dataframe = pd.read_parquet(data_path)
+    with open(metrics_path, "rb") as metrics_file:
+        metrics = orjson.loads(metrics_file.read())
+    return dataframe, metrics
+
+
+def save_stage_cache(stage_name, cache_key, dataframe, metrics):
+    """Save stage output to cache.
+    
+    Args:
+        stage_name: Pipeline stage name
+        cache_key: Key returned by get_stage_cache_key
+        dataframe: Stage output DataFrame
+        metrics: Stage metrics dictionary
+    """
+    data_path, metrics_path = _get_stage_cache_paths(stage_name, cache_key)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    
+    write_parquet(dataframe, data_path)
+    write_json(metrics, metrics_path)
@@ -1,9 +1,19 @@
 import torch
 import os
+from enum import IntEnum
 from dotenv import load_dotenv
 
 load_dotenv()
 
+class Stage(IntEnum):
+    """Pipeline stages in execution order, usable as array indices."""
+    
+    DIARIZATION = 0
+    ASR = 1
+    CORRECTION = 2
+    SUMMARIZATION = 3
+
+
 class ModelConfig:
     """Configuration class for all models."""
     
@@ -12,23 +22,75 @@ class ModelConfig:
     DIARIZATION_TOKEN = os.getenv("HF_TOKEN")
     
     # Automatic Speech Recognition model configuration
+    ASR_BACKEND = os.getenv("ASR_BACKEND", "transformers")  # "transformers" or "faster-whisper"
     ASR_MODEL_NAME = "openai/whisper-small"
+    ASR_FASTER_WHISPER_MODEL_NAME = "small"
     ASR_LANGUAGE = "russian"
+    ASR_LANGUAGE_CODE = "ru"
     ASR_TASK = "transcribe"
+    ASR_SAMPLING_RATE = 16000  # Hz, mono input expected by the ASR model
+    ASR_BATCH_SIZE = 8
+    ASR_CHUNK_LENGTH = 30  # seconds
+    ASR_PACK_MAX_DURATION = 28  # seconds of same-speaker audio per ASR input
+    ASR_PACK_GAP_DURATION = 0.2  # seconds of silence between packed segments
     
     # Text correction model configuration
     CORRECTION_MODEL_NAME = "ai-forever/sage-m2m100-1.2B"
     CORRECTION_SRC_LANG = "ru"
     CORRECTION_TGT_LANG = "ru"
+    CORRECTION_BATCH_SIZE = 16
+    CORRECTION_MAX_LENGTH = 512  # tokens
     
     # Summarization model configuration
     SUMMARIZATION_MODEL_NAME = "RussianNLP/FRED-T5-Summarizer"
+    SUMMARIZATION_NUM_BEAMS = 1
+    
+    # Precision parameters
+    LOAD_IN_8BIT = os.getenv("LOAD_IN_8BIT", "0") == "1"  # requires bitsandbytes and CUDA
+    COMPILE_GENERATION = os.getenv("COMPILE_GENERATION", "0") == "1"  # torch.compile decode step on CUDA
+    
+    # PyTorch runtime parameters
+    TORCH_MAX_THREADS = 8
     
     # Processing parameters
     MIN_SEGMENT_DURATION = 0.5  # seconds
-    MAX_SUMMARY_INPUT_LENGTH = 2000  # characters
+    MAX_SUMMARY_INPUT_TOKENS = 1024  # tokens, including the prompt
+    
+    # Stage parallelism
+    PIPELINE_QUEUE_SIZE = 8  # ASR batches buffered ahead of correction
+    
+    # Stage output cache
+    CACHE_DIR = os.getenv("PIPELINE_CACHE_DIR", "cache")
 
 
 def get_device():
     """Get available device (CUDA or CPU)."""
-    return "cuda:0" if torch.cuda.is_available() else "cpu"
\ No newline at end of file
+    return "cuda:0" if torch.cuda.is_available() else "cpu"
+
+
+def get_torch_dtype(allow_fp16=True):
+    """Get weight dtype for the available device.
+    
+    Native bf16 is used where the GPU supports it. Otherwise fp16 is used only
+    if allow_fp16 is set (T5-family models overflow in fp16), else fp32.
+    
+    Args:
+        allow_fp16: Whether the model is numerically safe in fp16
+        
+    Returns:
+        torch.dtype: Weight dtype
+    """
+    if not torch.cuda.is_available():
+        return torch.float32
+    if torch.cuda.is_bf16_supported(including_emulation=False):
+        return torch.bfloat16
+    return torch.float16 if allow_fp16 else torch.float32
+
+
+def configure_torch():
+    """Configure PyTorch threading and TF32 matmul precision."""
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
+    torch.set_float32_matmul_precision("high")
+    torch.set_num_threads(min(os.cpu_count() or 1, ModelConfig.TORCH_MAX_THREADS))
\ No newline at end of file
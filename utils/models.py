@@ -1,5 +1,9 @@
+from functools import lru_cache
+
+import torch
 from transformers import (
     pipeline, 
+    BitsAndBytesConfig,
     GPT2Tokenizer, 
     T5ForConditionalGeneration, 
     M2M100ForConditionalGeneration, 
@@ -7,9 +11,12 @@ from transformers import (
 )
 from pyannote.audio import Pipeline
 
-from .config import ModelConfig, get_device
+from .config import ModelConfig, configure_torch, get_device, get_torch_dtype
+
+configure_torch()
 
 
+@lru_cache(maxsize=None)
 def load_diarization_model():
     """Load speaker diarization model.
     
@@ -22,12 +29,58 @@ def load_diarization_model():
     )
 
 
+class FasterWhisperPipeline:
+    """Callable wrapper exposing faster-whisper through the HF pipeline interface."""
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def _transcribe(self, audio, word_timestamps):
+        if isinstance(audio, dict):
+            audio = audio["raw"]
+        transcribed_segments, _ = self.model.transcribe(
+            audio,
+            language=ModelConfig.ASR_LANGUAGE_CODE,
+            task=ModelConfig.ASR_TASK,
+            word_timestamps=word_timestamps
+        )
+        transcribed_segments = list(transcribed_segments)
+        result = {"text": "".join(segment.text for segment in transcribed_segments)}
+        if word_timestamps:
+            result["chunks"] = [
+                {"text": word.word, "timestamp": (word.start, word.end)}
+                for segment in transcribed_segments
+                for word in segment.words
+            ]
+        return result
+    
+    def __call__(self, inputs, return_timestamps=False, **kwargs):
+        word_timestamps = return_timestamps == "word"
+        if isinstance(inputs, list):
+            return [self._transcribe(audio, word_timestamps) for audio in inputs]
+        return self._transcribe(inputs, word_timestamps)
+
+
+@lru_cache(maxsize=None)
 def load_asr_model():
     """Load automatic speech recognition model.
     
+    The backend is selected by ModelConfig.ASR_BACKEND.
+    
     Returns:
-        pipeline: HuggingFace ASR pipeline
+        pipeline: HuggingFace ASR pipeline or a compatible callable
     """
+    if ModelConfig.ASR_BACKEND == "faster-whisper":
+        from faster_whisper import WhisperModel
+        
+        device = get_device()
+        model = WhisperModel(
+            ModelConfig.ASR_FASTER_WHISPER_MODEL_NAME,
+            device="cuda" if device.startswith("cuda") else "cpu",
+            compute_type="int8_float16" if device.startswith("cuda") else "int8"
+        )
+        return FasterWhisperPipeline(model)
+    
     return pipeline(
         "automatic-speech-recognition",
         model=ModelConfig.ASR_MODEL_NAME,
@@ -41,14 +94,59 @@ def load_asr_model():
     )
 
 
+def _compile_for_generation(model):
+    """Compile model forward pass with a static KV cache.
+    
+    Graphs are compiled on first use for each input shape.
+    
+    Args:
+        model: Seq2seq model in evaluation mode
+    """
+    model.generation_config.cache_implementation = "static"
+    model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=False)
+
+
+def _load_seq2seq_model(model_class, model_name, torch_dtype):
+    """Load a seq2seq model in reduced precision on the available device.
+    
+    Args:
+        model_class: Transformers model class to instantiate
+        model_name: Model name on HuggingFace Hub
+        torch_dtype: Weight dtype used when not loading in 8-bit
+        
+    Returns:
+        PreTrainedModel: Model in evaluation mode
+    """
+    if ModelConfig.LOAD_IN_8BIT and torch.cuda.is_available():
+        model = model_class.from_pretrained(
+            model_name,
+            quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+            device_map="auto"
+        )
+    else:
+        model = model_class.from_pretrained(
+            model_name,
+            torch_dtype=torch_dtype
+        )
+        model.to(get_device())
+    model.eval()
+    
+    if ModelConfig.COMPILE_GENERATION and torch.cuda.is_available():
+        _compile_for_generation(model)
+    return model
+
+
+@lru_cache(maxsize=None)
 def load_correction_model():
     """Load text correction model.
     
     Returns:
         tuple: (model, tokenizer) for text correction
     """
-    model = M2M100ForConditionalGeneration.from_pretrained(
-        ModelConfig.CORRECTION_MODEL_NAME
+    model = _load_seq2seq_model(
+        M2M100ForConditionalGeneration,
+        ModelConfig.CORRECTION_MODEL_NAME,
+        get_torch_dtype()
     )
     tokenizer = M2M100Tokenizer.from_pretrained(
         ModelConfig.CORRECTION_MODEL_NAME,
@@ -58,6 +156,7 @@ def load_correction_model():
     return model, tokenizer
 
 
+@lru_cache(maxsize=None)
 def load_summarization_model():
     """Load text summarization model.
     
@@ -68,8 +167,9 @@ def load_summarization_model():
         ModelConfig.SUMMARIZATION_MODEL_NAME, 
         eos_token="</s>"
     )
-    model = T5ForConditionalGeneration.from_pretrained(
-        ModelConfig.SUMMARIZATION_MODEL_NAME
+    model = _load_seq2seq_model(
+        T5ForConditionalGeneration,
+        ModelConfig.SUMMARIZATION_MODEL_NAME,
+        get_torch_dtype(allow_fp16=False)
     )
-    model.to(get_device())
     return model, tokenizer
\ No newline at end of file
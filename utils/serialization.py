@@ -0,0 +1,36 @@
+import orjson
+
+
+def write_json(data, file_path):
+    """Write dictionary with numpy values to JSON file.
+    
+    Args:
+        data: Dictionary to serialize
+        file_path: Path for output JSON file
+    """
+    json_bytes = orjson.dumps(
+        data,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+    )
+    with open(file_path, "wb") as output_file:
+        output_file.write(json_bytes)
+
+
+def write_parquet(dataframe, file_path):
+    """Write DataFrame to zstd-compressed Parquet file.
+    
+    Args:
+        dataframe: DataFrame to write
+        file_path: Path for output Parquet file
+    """
+    dataframe.to_parquet(file_path, compression="zstd", index=False)
+
+
+def write_csv(dataframe, file_path):
+    """Write DataFrame to human-readable CSV file.
+    
+    Args:
+        dataframe: DataFrame to write
+        file_path: Path for output CSV file
+    """
+    dataframe.to_csv(file_path, index=False, encoding="utf-8-sig")